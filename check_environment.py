@@ -7,6 +7,24 @@ Run this FIRST before running the simulation or deploying
 
 import sys
 import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+
+def is_installed(module_name):
+    """Check whether a module can be imported, without actually importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        # Parent package (e.g. 'google') is missing
+        return False
+
+
+# Buffer output in blocks instead of flushing every line - each flush is a
+# separate write, which is slow on a Pi serial console
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(line_buffering=False)
+
 
 print("="*60)
 print("AI Vision Assistant - Environment Check")
@@ -32,6 +50,7 @@ simulation_packages = [
     ('PIL', 'Pillow', 'Image processing'),
     ('google.generativeai', 'google-generativeai', 'Gemini API client'),
     ('dotenv', 'python-dotenv', 'Environment variables'),
+    ('pytest', 'pytest', 'Simulation tests'),
 ]
 
 # Optional packages (only needed on Raspberry Pi)
@@ -42,27 +61,41 @@ hardware_packages = [
     ('speech_recognition', 'SpeechRecognition', 'Voice recognition (Pi only)'),
 ]
 
+# Probe every package concurrently (spec lookups mostly wait on SD card I/O),
+# then report the results in list order
+module_names = [module_name for module_name, _, _ in simulation_packages + hardware_packages]
+with ThreadPoolExecutor(max_workers=4) as executor:
+    installed = dict(zip(module_names, executor.map(is_installed, module_names)))
+
 print("Required Packages for Simulation:")
 print("-" * 60)
 
 missing_packages = []
 for module_name, package_name, description in simulation_packages:
-    try:
-        __import__(module_name.split('.')[0])
+    if installed[module_name]:
         print(f"  ✓ {package_name:.<40} {description}")
-    except ImportError:
+    else:
         print(f"  ✗ {package_name:.<40} MISSING")
         missing_packages.append(package_name)
 
+# Pillow should be linked against libjpeg-turbo (SIMD JPEG encode/decode)
+try:
+    from PIL import features
+    if features.check_feature('libjpeg_turbo'):
+        print(f"  ✓ {'libjpeg-turbo':.<40} Fast JPEG encoding")
+    else:
+        print(f"  ○ {'libjpeg-turbo':.<40} Not used by Pillow (JPEG encoding will be slower)")
+except ImportError:
+    pass
+
 print()
 print("Optional Packages (for Raspberry Pi hardware):")
 print("-" * 60)
 
 for module_name, package_name, description in hardware_packages:
-    try:
-        __import__(module_name.split('.')[0])
+    if installed[module_name]:
         print(f"  ✓ {package_name:.<40} {description}")
-    except ImportError:
+    else:
         print(f"  ○ {package_name:.<40} Not installed (OK for simulation)")
 
 print()
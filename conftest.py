@@ -0,0 +1,62 @@
+"""
+Shared pytest fixtures for the simulation tests
+Mocks the Raspberry Pi hardware so main.py can be tested on any computer
+"""
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def mock_hardware():
+    """Replace the hardware-specific modules with mocks for the whole session"""
+    with pytest.MonkeyPatch.context() as mp:
+        # Dummy key instead of a temporary .env file (parallel workers would
+        # race on it), and keep any real .env out of the tests
+        mp.setenv('GEMINI_API_KEY', 'test_api_key_for_simulation')
+        mp.setenv('PIZERO_SKIP_DOTENV', '1')
+
+        # Picamera2 (camera)
+        picamera2 = MagicMock()
+        picamera2.Picamera2.return_value.create_still_configuration.return_value = {}
+        mp.setitem(sys.modules, 'picamera2', picamera2)
+
+        # PyAudio (microphone, used by speech recognition)
+        mp.setitem(sys.modules, 'pyaudio', MagicMock())
+
+        # pyttsx3 (speaker)
+        mp.setitem(sys.modules, 'pyttsx3', MagicMock())
+
+        yield
+
+
+@pytest.fixture(scope='session')
+def main_module(mock_hardware):
+    """main.py, imported once the hardware mocks are in place"""
+    import main
+    return main
+
+
+@pytest.fixture(scope='session')
+def config(main_module, tmp_path_factory):
+    """Default configuration, writing images and TTS audio outside the checkout"""
+    config = main_module.Config()
+    config.IMAGE_DIR = str(tmp_path_factory.mktemp('captured_images'))
+    config.TTS_CACHE_DIR = str(tmp_path_factory.mktemp('tts_cache'))
+    return config
+
+
+@pytest.fixture(scope='session')
+def assistant(main_module, config):
+    """VisionAssistant running on the mocked camera, microphone, TTS and Gemini API"""
+    with patch('speech_recognition.Recognizer'), \
+         patch('speech_recognition.Microphone'), \
+         patch('google.generativeai.configure'), \
+         patch('google.generativeai.GenerativeModel'):
+        assistant = main_module.VisionAssistant(config)
+
+    yield assistant
+
+    assistant.cleanup()
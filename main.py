@@ -6,18 +6,40 @@ Captures images on voice command and describes them using Gemini API
 
 import os
 import io
+import argparse
+import functools
+import re
+import json
 import time
-from datetime import datetime
+import queue
+import shutil
+import hashlib
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 import speech_recognition as sr
-import pyttsx3
-from picamera2 import Picamera2
-from PIL import Image
-import google.generativeai as genai
+from PIL import Image, ImageStat
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env (existing environment variables win).
+# Set PIZERO_SKIP_DOTENV=1 to never read .env, e.g. when a systemd unit
+# already provides the environment.
+if os.getenv('PIZERO_SKIP_DOTENV') != '1':
+    load_dotenv()
+
+# Heavy hardware/API modules (picamera2, pyttsx3, google.generativeai) are
+# imported in the setup methods that use them - google.generativeai alone
+# takes seconds to import on a Pi Zero
+_genai = None
+
+
+def _lazy_genai():
+    """Import google.generativeai on first use"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
 
 # Configuration
 class Config:
@@ -28,36 +50,226 @@ class Config:
     GEMINI_MODEL = 'gemini-1.5-flash'  # Fast and efficient for Pi Zero
     
     # Image Settings
-    MAX_IMAGE_SIZE = 1024  # Maximum dimension (width or height)
+    MAX_IMAGE_SIZE = 768  # Maximum dimension (width or height) - matches Gemini's 768px tiles
     JPEG_QUALITY = 85  # JPEG compression quality (1-100)
+    TEXT_JPEG_QUALITY = 90  # Quality for labels/documents so small text stays legible
+    SCENE_JPEG_QUALITY = 78  # Quality for general "what is this" requests
+    ADAPTIVE_JPEG_QUALITY = True  # Pick quality from image detail for general requests
     IMAGE_DIR = 'captured_images'
     
     # Camera Settings
-    CAMERA_RESOLUTION = (1920, 1080)  # Full HD
+    CAMERA_RESOLUTION = (1920, 1080)  # Full HD (only used when SAVE_FULL_RESOLUTION is on)
+    ANALYSIS_RESOLUTION = (768, 432)  # Captured directly by the camera, scaled in hardware
+    SAVE_FULL_RESOLUTION = False  # Capture at CAMERA_RESOLUTION to keep high-quality copies
     CAMERA_WARMUP_TIME = 2  # Seconds to let camera adjust
     
     # Voice Recognition Settings
     KEYWORD = 'click'  # Trigger word
     EXIT_KEYWORDS = ['exit', 'quit', 'stop']
     MICROPHONE_INDEX = None  # None = default, or specify index
+    AMBIENT_NOISE_DURATION = 1.0  # Seconds of noise calibration at startup
+    VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH')  # Optional offline keyword spotting model
     
     # Text-to-Speech Settings
     TTS_RATE = 150  # Words per minute
     TTS_VOLUME = 0.9  # Volume level (0.0 to 1.0)
+    TTS_CACHE_DIR = '.tts_cache'  # Pre-synthesized audio for the fixed phrases below
+    CANNED_PHRASES = [
+        'AI Vision Assistant ready',
+        'Taking picture',
+        'Analyzing',
+        'Goodbye',
+        'Sorry, I encountered an error processing the image',
+    ]
+
+
+# Sentence boundaries used to start speaking streamed responses early - line
+# breaks count too, since the prompts ask for "- ..." lists without punctuation
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+# Intent keywords, in priority order (medication first - it is safety-critical)
+INTENT_KEYWORDS = {
+    'medication': ['prescription', 'medication', 'medicine', 'pill', 'drug', 'dosage', 'dose'],
+    'food': ['food', 'ingredients', 'nutrition', 'allergen', 'eat', 'calories'],
+    'document': ['read', 'document', 'letter', 'text', 'form', 'paper'],
+    'general': ['what', 'identify', 'describe', 'tell me'],
+}
+
+# All keywords compiled into one pattern so a single scan classifies the request.
+# The lookahead makes every match zero-width, so a keyword can't use up the
+# characters of an overlapping one ("tell me" vs "medication" in "tell medication")
+_INTENT_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{intent}>{'|'.join(re.escape(word) for word in words)})"
+    for intent, words in INTENT_KEYWORDS.items()
+) + ')')
+
+
+def classify_intent(user_request: str) -> str:
+    """
+    Classify a user request into one of the INTENT_KEYWORDS categories
+
+    Args:
+        user_request: The user's spoken request
+
+    Returns:
+        Intent name, or None if no keyword matched
+    """
+    found = {match.lastgroup for match in _INTENT_RE.finditer(user_request.lower())}
+    return next((intent for intent in INTENT_KEYWORDS if intent in found), None)
+
+
+# Prompts for each specific intent
+INTENT_PROMPTS = {
+    'medication': """Read and analyze this medication label or prescription. Provide:
+- Medication name (brand and generic)
+- Dosage and strength
+- Instructions for use (how often, when to take, with/without food)
+- Important warnings and precautions
+- Expiration date
+- Active ingredients
+- Any other critical safety information
+
+Be clear, accurate, and thorough. This is safety-critical information.""",
+
+    'food': """Analyze this food product label. Provide:
+- Product name and type
+- Key ingredients (especially first 5)
+- Allergen warnings (nuts, dairy, gluten, etc.)
+- Nutritional highlights (calories, protein, sugar, etc.)
+- Expiration or best-by date
+- Serving size information
+
+Focus on health and safety relevant information.""",
+
+    'document': """Read and extract the text from this document. Provide:
+- Main heading or title
+- Key information and important text
+- Any dates, numbers, or critical details
+- Structure (sections, bullet points, etc.)
+
+Read it clearly as if reading aloud to someone.""",
+}
+
+GENERAL_PROMPT_TEMPLATE = """The user asked: "{user_request}"
+
+Analyze this image and answer their question. Provide relevant information about:
+- What you see in the image
+- Key details that answer their question
+- Any important context or information
+
+Be helpful, clear, and focused on what the user asked."""
+
+# Default prompt when the user gives no specific request
+DEFAULT_PROMPT = """Analyze this image and provide relevant information based on what you see.
+
+MEDICATION LABELS - If this is a medication bottle, prescription label, pill bottle, or pharmaceutical product:
+- Medication name (brand and generic if visible)
+- Dosage and strength (e.g., "500 mg", "10 ml")
+- Instructions for use (e.g., "Take twice daily with food")
+- Important warnings or precautions
+- Expiration date if visible
+- Active ingredients
+- Prescription number if visible
+- Any critical safety information
+Format this clearly and read it in a way that's easy to understand when spoken aloud.
+
+FOOD LABELS - If this is food packaging or nutrition label:
+- Product name and type
+- Key ingredients
+- Nutritional highlights
+- Allergen warnings
+- Expiration or best-by date
+- Serving information
+
+DOCUMENTS/TEXT - If this contains text, forms, or documents:
+- Main heading or title
+- Key information or important text
+- Any dates, numbers, or critical details
+- Purpose of the document
+
+GENERAL OBJECTS - For other items:
+- What the object is
+- Its purpose or function
+- Notable features or condition
+- Any text, labels, or markings visible
+- Relevant context or usage information
+
+IMPORTANT: Be concise, clear, and prioritize safety-critical information first (especially for medications). Speak naturally as if helping someone who cannot see the image."""
 
 
 class ImageOptimizer:
     """Handles image optimization for efficient API usage"""
+
+    # Mean 8x8 block variance -> JPEG quality (interpolated between points).
+    # Flat images hide compression well; detailed ones need more quality.
+    QUALITY_LUT = ((0, 60), (25, 70), (100, 80), (400, 90))
+
+    @staticmethod
+    def choose_quality(image: Image.Image) -> int:
+        """
+        Pick a JPEG quality from how much detail the image contains
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            JPEG quality (60-90)
+        """
+        # Small images are cheap to upload anyway - not worth the analysis
+        if image.width * image.height < 512 * 512:
+            return 75
+
+        # Measure detail on a 64x64 grayscale thumbnail, in 8x8 blocks
+        small = image.resize((64, 64), Image.Resampling.BOX).convert('L')
+        variances = [
+            ImageStat.Stat(small.crop((x, y, x + 8, y + 8))).var[0]
+            for y in range(0, 64, 8)
+            for x in range(0, 64, 8)
+        ]
+        detail = sum(variances) / len(variances)
+
+        lut = ImageOptimizer.QUALITY_LUT
+        if detail >= lut[-1][0]:
+            return lut[-1][1]
+        for (x0, q0), (x1, q1) in zip(lut, lut[1:]):
+            if detail < x1:
+                return round(q0 + (q1 - q0) * (detail - x0) / (x1 - x0))
     
     @staticmethod
-    def optimize_image(image: Image.Image, max_size: int = 1024, quality: int = 85) -> bytes:
+    @functools.lru_cache(maxsize=32)
+    def _fit_size(width: int, height: int, max_size: int) -> tuple[int, int]:
+        """
+        Scale (width, height) to fit within max_size, keeping the aspect ratio
+
+        Integer-only math (rounded), cached since the camera resolution is fixed
+
+        Args:
+            width: Current width
+            height: Current height
+            max_size: Maximum dimension (width or height)
+
+        Returns:
+            Tuple of (new_width, new_height)
+        """
+        if width > height:
+            return max_size, max(1, (height * max_size + width // 2) // width)
+        return max(1, (width * max_size + height // 2) // height), max_size
+
+    @staticmethod
+    def optimize_image(image: Image.Image, max_size: int = 768, quality: int = 85,
+                       fast: bool = True) -> bytes:
         """
         Optimize image by resizing and compressing
+
+        The caller's image is left unchanged.
         
         Args:
             image: PIL Image object
             max_size: Maximum dimension (width or height)
             quality: JPEG quality (1-100)
+            fast: Single-pass baseline encode for real-time use; False spends
+                extra CPU on optimized Huffman tables + progressive (archival)
             
         Returns:
             Optimized image as bytes
@@ -65,30 +277,92 @@ class ImageOptimizer:
         # Calculate new size maintaining aspect ratio
         width, height = image.size
         if width > max_size or height > max_size:
-            if width > height:
-                new_width = max_size
-                new_height = int(height * (max_size / width))
-            else:
-                new_height = max_size
-                new_width = int(width * (max_size / height))
-            
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            new_width, new_height = ImageOptimizer._fit_size(width, height, max_size)
+
+            # reducing_gap box-reduces by an integer factor first, then
+            # LANCZOS only covers the rest - much faster on big downscales.
+            # A gap of 1.0 reduces as far as possible (1920 -> 960 -> 768),
+            # slightly softer but fine for upload; archival keeps 2.0
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS,
+                                 reducing_gap=1.0 if fast else 2.0)
         
+        # Nothing to composite if there is no real transparency - a single
+        # convert is much cheaper than allocating a background and pasting
+        if image.mode == 'P' and 'transparency' not in image.info:
+            image = image.convert('RGB')
+        elif image.mode in ('RGBA', 'LA') and image.getextrema()[-1][0] == 255:
+            image = image.convert('RGB')
+
         # Convert to RGB if necessary (remove alpha channel)
         if image.mode in ('RGBA', 'LA', 'P'):
             background = Image.new('RGB', image.size, (255, 255, 255))
             if image.mode == 'P':
                 image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+            # An RGBA/LA image can be its own mask - PIL reads the alpha band in
+            # place, so no separate alpha plane is allocated
+            background.paste(image, mask=image)
             image = background
         
         # Compress to JPEG
         buffer = io.BytesIO()
-        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        # 4:2:0 chroma subsampling keeps files small at the same perceived
+        # quality. Optimized Huffman tables need a second pass over the data
+        # (progressive implies them), so only spend that CPU when not in a hurry
+        image.save(buffer, format='JPEG', quality=quality, optimize=not fast,
+                   progressive=not fast, subsampling=2)
         
         return buffer.getvalue()
 
 
+class AsyncImageOptimizer:
+    """Runs ImageOptimizer (and the file writes that follow) on a small thread pool
+
+    PIL releases the GIL while resizing and encoding, so on multi-core boards
+    (Pi Zero 2 W) encodes really run in parallel with other work. On a
+    single-core Pi Zero the pool has one worker, so jobs run one after another
+    in the order they were submitted.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """Create the worker pool (default: up to 2 workers, one per core)"""
+        if max_workers is None:
+            max_workers = min(2, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit_optimize(self, image: Image.Image, max_size: int = 768, quality: int = 85,
+                        fast: bool = True) -> Future:
+        """
+        Start optimizing an image in the background
+
+        Args:
+            image: PIL Image object
+            max_size: Maximum dimension (width or height)
+            quality: JPEG quality (1-100)
+            fast: See ImageOptimizer.optimize_image
+
+        Returns:
+            Future resolving to the optimized image bytes
+        """
+        return self._executor.submit(ImageOptimizer.optimize_image, image, max_size, quality, fast)
+
+    def submit_write(self, filepath: str, data: bytes) -> Future:
+        """
+        Write already-encoded image bytes to disk in the background
+
+        Args:
+            filepath: Path to write to
+            data: Encoded image bytes
+
+        Returns:
+            Future resolving when the file is written
+        """
+        return self._executor.submit(Path(filepath).write_bytes, data)
+
+    def shutdown(self):
+        """Wait for pending encodes and file writes, and stop the workers"""
+        self._executor.shutdown(wait=True)
+
+
 class VisionAssistant:
     """Main application class for AI Vision Assistant"""
     
@@ -97,14 +371,24 @@ class VisionAssistant:
         self.config = config
         self.camera = None
         self.recognizer = sr.Recognizer()
+        self.microphone = None
+        self.keyword_spotter = None
         self.tts_engine = None
+        self.canned_audio = {}
         self.gemini_model = None
+
+        # Background worker so capture/analysis overlap with spoken feedback
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.image_optimizer = AsyncImageOptimizer()
         
         # Create image directory
-        Path(config.IMAGE_DIR).mkdir(exist_ok=True)
+        self._img_dir = Path(config.IMAGE_DIR)
+        self._img_dir.mkdir(exist_ok=True)
         
         # Initialize components
         self._setup_camera()
+        self._setup_microphone()
+        self._setup_keyword_spotter()
         self._setup_tts()
         self._setup_gemini()
         
@@ -112,11 +396,17 @@ class VisionAssistant:
         """Initialize Raspberry Pi Camera"""
         try:
             print("Initializing camera...")
+            from picamera2 import Picamera2
             self.camera = Picamera2()
             
-            # Configure camera
+            # Configure camera - the ISP scales to the analysis size for free,
+            # so only capture Full HD if we want to keep high-quality copies
+            if self.config.SAVE_FULL_RESOLUTION:
+                resolution = self.config.CAMERA_RESOLUTION
+            else:
+                resolution = self.config.ANALYSIS_RESOLUTION
             camera_config = self.camera.create_still_configuration(
-                main={"size": self.config.CAMERA_RESOLUTION}
+                main={"size": resolution}
             )
             self.camera.configure(camera_config)
             self.camera.start()
@@ -130,17 +420,101 @@ class VisionAssistant:
             print(f"Error initializing camera: {e}")
             raise
     
+    def _setup_microphone(self):
+        """Initialize microphone and calibrate for ambient noise once"""
+        try:
+            print("Initializing microphone...")
+            self.microphone = sr.Microphone(device_index=self.config.MICROPHONE_INDEX)
+
+            # Calibrate once here instead of on every listen - the recognizer's
+            # dynamic energy threshold keeps tracking the room afterwards
+            print(f"Calibrating for ambient noise ({self.config.AMBIENT_NOISE_DURATION} seconds)...")
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(
+                    source, duration=self.config.AMBIENT_NOISE_DURATION
+                )
+
+            print("Microphone ready!")
+        except Exception as e:
+            print(f"Error initializing microphone: {e}")
+            raise
+
+    def _setup_keyword_spotter(self):
+        """Initialize optional offline keyword spotting (Vosk)"""
+        if not self.config.VOSK_MODEL_PATH:
+            return
+
+        try:
+            import vosk
+        except ImportError:
+            print("VOSK_MODEL_PATH is set but vosk is not installed - using online recognition only")
+            return
+
+        try:
+            print("Loading offline keyword model...")
+            vosk.SetLogLevel(-1)
+            model = vosk.Model(self.config.VOSK_MODEL_PATH)
+
+            # Restrict the vocabulary to the words we act on - much faster and
+            # more reliable than free-form recognition on a Pi Zero
+            grammar = json.dumps([self.config.KEYWORD, *self.config.EXIT_KEYWORDS, "[unk]"])
+            self.keyword_spotter = vosk.KaldiRecognizer(model, 16000, grammar)
+            print("Offline keyword spotting ready!")
+        except Exception as e:
+            print(f"Error loading keyword model: {e}")
+            raise
+
+    def _spot_keyword(self, audio) -> bool:
+        """
+        Check locally whether the audio contains the keyword or an exit word
+
+        Args:
+            audio: AudioData from the recognizer
+
+        Returns:
+            True if the audio should be sent for full recognition
+        """
+        self.keyword_spotter.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        text = json.loads(self.keyword_spotter.FinalResult()).get('text', '')
+        # Substring match (like run()) so multi-word keywords work too
+        return any(word in text for word in [self.config.KEYWORD, *self.config.EXIT_KEYWORDS])
+
     def _setup_tts(self):
         """Initialize text-to-speech engine"""
         try:
             print("Initializing text-to-speech...")
+            import pyttsx3
             self.tts_engine = pyttsx3.init()
             self.tts_engine.setProperty('rate', self.config.TTS_RATE)
             self.tts_engine.setProperty('volume', self.config.TTS_VOLUME)
+            self._prepare_canned_phrases()
             print("Text-to-speech ready!")
         except Exception as e:
             print(f"Error initializing TTS: {e}")
             raise
+
+    def _prepare_canned_phrases(self):
+        """Synthesize the fixed phrases to WAV once so they play back instantly"""
+        if not shutil.which('aplay'):
+            return
+
+        cache_dir = Path(self.config.TTS_CACHE_DIR)
+        cache_dir.mkdir(exist_ok=True)
+
+        paths = {}
+        for phrase in self.config.CANNED_PHRASES:
+            # Include the voice settings so changing them re-synthesizes
+            key = f"{phrase}|{self.config.TTS_RATE}|{self.config.TTS_VOLUME}"
+            path = cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.wav"
+            if not path.exists():
+                self.tts_engine.save_to_file(phrase, str(path))
+            paths[phrase] = path
+
+        # Synthesizes everything queued above in one go (no-op if all cached)
+        self.tts_engine.runAndWait()
+
+        self.canned_audio = {phrase: path for phrase, path in paths.items() if path.exists()}
+        print(f"Cached {len(self.canned_audio)} phrases for instant playback")
     
     def _setup_gemini(self):
         """Initialize Gemini API"""
@@ -149,8 +523,20 @@ class VisionAssistant:
             if not self.config.GEMINI_API_KEY:
                 raise ValueError("GEMINI_API_KEY not found in environment variables")
             
-            genai.configure(api_key=self.config.GEMINI_API_KEY)
+            genai = _lazy_genai()
+
+            # gRPC keeps one persistent HTTP/2 connection for all requests
+            genai.configure(api_key=self.config.GEMINI_API_KEY, transport='grpc')
             self.gemini_model = genai.GenerativeModel(self.config.GEMINI_MODEL)
+
+            # Pay the connection/TLS handshake cost now instead of on the first capture.
+            # Short timeout and no retries - without network (e.g. Wi-Fi still
+            # coming up) the SDK defaults would block startup for up to a minute
+            try:
+                self.gemini_model.count_tokens("warmup", request_options={"timeout": 5, "retry": None})
+            except Exception as e:
+                print(f"Gemini warmup failed (will retry on first request): {e}")
+
             print("Gemini API ready!")
         except Exception as e:
             print(f"Error initializing Gemini API: {e}")
@@ -160,30 +546,45 @@ class VisionAssistant:
         """Convert text to speech"""
         print(f"Speaking: {text}")
         try:
+            # Fixed phrases skip synthesis entirely
+            if text in self.canned_audio:
+                try:
+                    subprocess.run(['aplay', '-q', str(self.canned_audio[text])], check=True)
+                    return
+                except (OSError, subprocess.CalledProcessError) as e:
+                    # e.g. no ALSA default device (audio through Pulse/Bluetooth)
+                    print(f"Cached audio playback failed ({e}), using TTS engine")
+
             self.tts_engine.say(text)
             self.tts_engine.runAndWait()
         except Exception as e:
             print(f"Error in text-to-speech: {e}")
     
-    def capture_image(self) -> tuple[Image.Image, str]:
+    def capture_image(self, save_archival: bool = True) -> tuple[Image.Image, str]:
         """
         Capture an image from the camera
         
+        Args:
+            save_archival: Start the full-resolution copy's encode (only with
+                SAVE_FULL_RESOLUTION); False leaves it to the caller
+
         Returns:
             Tuple of (PIL Image, filepath)
         """
         try:
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(self.config.IMAGE_DIR, f"capture_{timestamp}.jpg")
+            # Generate filename with timestamp (nanoseconds - cheaper than strftime
+            # and never collides between quick captures)
+            filepath = str(self._img_dir / f"capture_{time.time_ns()}.jpg")
             
-            # Capture image
+            # Capture straight into memory (no SD card write + JPEG decode)
             print("Capturing image...")
-            self.camera.capture_file(filepath)
-            
-            # Load image as PIL Image
-            image = Image.open(filepath)
-            
+            image = self.camera.capture_image("main")
+
+            # Full-resolution copies need their own encode (in the background);
+            # otherwise analyze_image saves the JPEG it already encoded
+            if save_archival and self.config.SAVE_FULL_RESOLUTION:
+                self._save_archival_copy(image, filepath)
+
             print(f"Image captured: {filepath}")
             return image, filepath
             
@@ -191,148 +592,171 @@ class VisionAssistant:
             print(f"Error capturing image: {e}")
             raise
     
-    def _build_prompt(self, user_request: str = None) -> str:
+    def _save_archival_copy(self, image: Image.Image, filepath: str):
+        """Save a full-resolution copy in the background, optimized for size rather than speed"""
+        future = self.image_optimizer.submit_optimize(
+            image,
+            max_size=max(image.size),
+            quality=self.config.JPEG_QUALITY,
+            fast=False
+        )
+        future.add_done_callback(lambda done: Path(filepath).write_bytes(done.result()))
+
+    def _build_prompt(self, user_request: str = None, intent: str = None) -> str:
         """
         Build dynamic prompt based on user request
 
         Args:
             user_request: Optional specific user request
+            intent: Intent of the request, from classify_intent
 
         Returns:
             Tailored prompt string
         """
         if user_request:
-            # Analyze user intent from their request
-            request_lower = user_request.lower()
+            if intent == 'general':
+                return GENERAL_PROMPT_TEMPLATE.format(user_request=user_request)
+            if intent:
+                return INTENT_PROMPTS[intent]
 
-            # Medication/prescription focused
-            if any(word in request_lower for word in ['prescription', 'medication', 'medicine', 'pill', 'drug', 'dosage', 'dose']):
-                return """Read and analyze this medication label or prescription. Provide:
-- Medication name (brand and generic)
-- Dosage and strength
-- Instructions for use (how often, when to take, with/without food)
-- Important warnings and precautions
-- Expiration date
-- Active ingredients
-- Any other critical safety information
+        # Default intelligent prompt if no specific request
+        return DEFAULT_PROMPT
 
-Be clear, accurate, and thorough. This is safety-critical information."""
+    def _upload_quality(self, image: Image.Image, intent: str = None) -> int:
+        """
+        Pick the JPEG quality for the upload based on the request
 
-            # Food/nutrition focused
-            elif any(word in request_lower for word in ['food', 'ingredients', 'nutrition', 'allergen', 'eat', 'calories']):
-                return """Analyze this food product label. Provide:
-- Product name and type
-- Key ingredients (especially first 5)
-- Allergen warnings (nuts, dairy, gluten, etc.)
-- Nutritional highlights (calories, protein, sugar, etc.)
-- Expiration or best-by date
-- Serving size information
+        Args:
+            image: PIL Image object
+            intent: Intent of the request, from classify_intent
 
-Focus on health and safety relevant information."""
+        Returns:
+            JPEG quality (1-100)
+        """
+        # Text needs detail to stay readable
+        if intent in ('medication', 'food', 'document'):
+            return self.config.TEXT_JPEG_QUALITY
 
-            # Document/text reading
-            elif any(word in request_lower for word in ['read', 'document', 'letter', 'text', 'form', 'paper']):
-                return """Read and extract the text from this document. Provide:
-- Main heading or title
-- Key information and important text
-- Any dates, numbers, or critical details
-- Structure (sections, bullet points, etc.)
+        # Scenes get a quality matched to how much detail they contain
+        if intent == 'general':
+            if self.config.ADAPTIVE_JPEG_QUALITY:
+                return ImageOptimizer.choose_quality(image)
+            return self.config.SCENE_JPEG_QUALITY
 
-Read it clearly as if reading aloud to someone."""
+        # No request: the default prompt reads labels (dosages, expiry dates),
+        # and fine print is lost in choose_quality's thumbnail - keep the standard quality
+        return self.config.JPEG_QUALITY
 
-            # General identification
-            elif any(word in request_lower for word in ['what', 'identify', 'describe', 'tell me']):
-                return f"""The user asked: "{user_request}"
+    def _upload_encode_options(self, image: Image.Image, intent: str = None) -> dict:
+        """
+        Pick the encode settings for the upload
 
-Analyze this image and answer their question. Provide relevant information about:
-- What you see in the image
-- Key details that answer their question
-- Any important context or information
+        Args:
+            image: PIL Image object
+            intent: Intent of the request, from classify_intent
 
-Be helpful, clear, and focused on what the user asked."""
+        Returns:
+            Keyword arguments for ImageOptimizer.optimize_image
+        """
+        quality = self._upload_quality(image, intent)
+        print(f"Optimizing image for analysis at quality {quality}...")
+        return {"max_size": self.config.MAX_IMAGE_SIZE, "quality": quality, "fast": True}
 
-        # Default intelligent prompt if no specific request
-        return """Analyze this image and provide relevant information based on what you see.
+    def _start_upload_encode(self, image: Image.Image, intent: str = None) -> Future:
+        """
+        Start encoding the image for upload in the background
 
-MEDICATION LABELS - If this is a medication bottle, prescription label, pill bottle, or pharmaceutical product:
-- Medication name (brand and generic if visible)
-- Dosage and strength (e.g., "500 mg", "10 ml")
-- Instructions for use (e.g., "Take twice daily with food")
-- Important warnings or precautions
-- Expiration date if visible
-- Active ingredients
-- Prescription number if visible
-- Any critical safety information
-Format this clearly and read it in a way that's easy to understand when spoken aloud.
+        Args:
+            image: PIL Image object
+            intent: Intent of the request, from classify_intent
 
-FOOD LABELS - If this is food packaging or nutrition label:
-- Product name and type
-- Key ingredients
-- Nutritional highlights
-- Allergen warnings
-- Expiration or best-by date
-- Serving information
+        Returns:
+            Future resolving to the optimized JPEG bytes
+        """
+        return self.image_optimizer.submit_optimize(image, **self._upload_encode_options(image, intent))
 
-DOCUMENTS/TEXT - If this contains text, forms, or documents:
-- Main heading or title
-- Key information or important text
-- Any dates, numbers, or critical details
-- Purpose of the document
+    def _capture_and_encode(self, intent: str = None) -> tuple[Image.Image, str, Future]:
+        """
+        Capture an image and start encoding it for upload right away
 
-GENERAL OBJECTS - For other items:
-- What the object is
-- Its purpose or function
-- Notable features or condition
-- Any text, labels, or markings visible
-- Relevant context or usage information
+        Args:
+            intent: Intent of the request, from classify_intent
 
-IMPORTANT: Be concise, clear, and prioritize safety-critical information first (especially for medications). Speak naturally as if helping someone who cannot see the image."""
+        Returns:
+            Tuple of (PIL Image, filepath, Future resolving to the optimized JPEG bytes)
+        """
+        image, filepath = self.capture_image(save_archival=False)
 
-    def analyze_image(self, image: Image.Image, user_request: str = None) -> str:
+        # Upload encode first - with one worker (single core) the slow archival
+        # encode must not hold it up
+        encoded = self._start_upload_encode(image, intent)
+        if self.config.SAVE_FULL_RESOLUTION:
+            self._save_archival_copy(image, filepath)
+
+        return image, filepath, encoded
+
+    def analyze_image(self, image: Image.Image, user_request: str = None, on_chunk=None,
+                      save_path: str = None, encoded: Future = None, intent: str = None) -> str:
         """
         Analyze image using Gemini API
 
         Args:
             image: PIL Image object
             user_request: Optional user's specific request (e.g., "read the prescription")
+            on_chunk: Optional callback receiving each piece of text as it streams in
+            save_path: Optional path to also write the optimized JPEG to
+            encoded: Optional Future from _start_upload_encode, if encoding already started
+            intent: Intent of user_request if already classified (classified here otherwise)
 
         Returns:
             Description text from Gemini
         """
         try:
-            print("Optimizing image for analysis...")
+            # User intent picks both the quality and the prompt
+            if intent is None and user_request:
+                intent = classify_intent(user_request)
 
-            # Optimize image
-            optimized_bytes = ImageOptimizer.optimize_image(
-                image,
-                max_size=self.config.MAX_IMAGE_SIZE,
-                quality=self.config.JPEG_QUALITY
-            )
+            # Build prompt based on user request
+            prompt = self._build_prompt(user_request, intent)
 
-            # Convert bytes to PIL Image for Gemini
-            optimized_image = Image.open(io.BytesIO(optimized_bytes))
+            if encoded is not None:
+                optimized_bytes = encoded.result()
+            else:
+                # Nothing to overlap the encode with - do it on this thread
+                optimized_bytes = ImageOptimizer.optimize_image(
+                    image, **self._upload_encode_options(image, intent)
+                )
+
+            # Keep the encoded JPEG as the on-disk copy instead of encoding twice
+            if save_path:
+                self.image_optimizer.submit_write(save_path, optimized_bytes)
 
-            # Calculate original size for comparison
-            original_buffer = io.BytesIO()
-            image.save(original_buffer, format='JPEG')
-            original_size = len(original_buffer.getvalue())
+            # Send the JPEG bytes as-is (no decode/re-encode by the SDK)
+            image_part = {"mime_type": "image/jpeg", "data": optimized_bytes}
+
+            # Compare against the raw pixel data (avoids a second JPEG encode)
+            original_size = image.width * image.height * len(image.getbands())
             optimized_size = len(optimized_bytes)
 
             reduction_percent = ((original_size - optimized_size) / original_size * 100) if original_size > 0 else 0
-            print(f"Image optimized: {optimized_size / 1024:.1f} KB (reduced by {reduction_percent:.1f}%)")
+            print(f"Image optimized: {optimized_size / 1024:.1f} KB (reduced by {reduction_percent:.1f}% from raw)")
 
             # Generate description
             print("Analyzing image with Gemini...")
 
-            # Build prompt based on user request
-            prompt = self._build_prompt(user_request)
-
             if user_request:
                 print(f"User requested: '{user_request}'")
 
-            response = self.gemini_model.generate_content([prompt, optimized_image])
-            
-            description = response.text
+            # Stream the response so speaking can start before it is complete
+            response = self.gemini_model.generate_content([prompt, image_part], stream=True)
+
+            chunks = []
+            for chunk in response:
+                chunks.append(chunk.text)
+                if on_chunk:
+                    on_chunk(chunk.text)
+
+            description = "".join(chunks)
             print(f"Analysis complete: {description[:100]}...")
             
             return description
@@ -341,6 +765,44 @@ IMPORTANT: Be concise, clear, and prioritize safety-critical information first (
             print(f"Error analyzing image: {e}")
             return f"Sorry, I encountered an error analyzing the image: {str(e)}"
     
+    def _analyze_to_sentences(self, image: Image.Image, user_request: str, sentences: queue.Queue,
+                              save_path: str = None, encoded: Future = None, intent: str = None):
+        """
+        Analyze image and put each complete sentence on a queue as it streams in
+
+        Args:
+            image: PIL Image object
+            user_request: Optional user's specific request
+            sentences: Queue receiving sentences, followed by None when done
+            save_path: Optional path to also write the optimized JPEG to
+            encoded: Optional Future from _start_upload_encode, if encoding already started
+            intent: Intent of user_request if already classified
+        """
+        buffer = ""
+        streamed = []
+
+        def on_chunk(text):
+            nonlocal buffer
+            streamed.append(text)
+            buffer += text
+            # Everything up to the last sentence break is ready to speak
+            *complete, buffer = _SENTENCE_END_RE.split(buffer)
+            for sentence in complete:
+                if sentence.strip():
+                    sentences.put(sentence)
+
+        try:
+            description = self.analyze_image(image, user_request, on_chunk=on_chunk, save_path=save_path,
+                                             encoded=encoded, intent=intent)
+
+            if buffer.strip():
+                sentences.put(buffer)
+            # Errors come back as a message instead of streamed text
+            if description != "".join(streamed):
+                sentences.put(description)
+        finally:
+            sentences.put(None)
+
     def listen_for_keyword(self) -> str:
         """
         Listen for voice keyword and optional command
@@ -348,16 +810,17 @@ IMPORTANT: Be concise, clear, and prioritize safety-critical information first (
         Returns:
             Recognized text (lowercase)
         """
-        with sr.Microphone(device_index=self.config.MICROPHONE_INDEX) as source:
+        with self.microphone as source:
             print("\nListening for keyword...")
 
-            # Adjust for ambient noise
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-
             try:
                 # Listen with longer timeout to capture full commands like "click: read the prescription"
                 audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
 
+                # Only pay for the cloud round-trip if the keyword was heard locally
+                if self.keyword_spotter and not self._spot_keyword(audio):
+                    return ""
+
                 # Recognize speech
                 text = self.recognizer.recognize_google(audio).lower()
                 print(f"Heard: '{text}'")
@@ -380,18 +843,27 @@ IMPORTANT: Be concise, clear, and prioritize safety-critical information first (
             user_request: Optional specific user request (e.g., "read the prescription")
         """
         try:
-            # Give audio feedback
-            self.speak("Taking picture")
+            # The intent is known before capture, so the upload encode can start
+            # as soon as the frame is in - it runs while the feedback is spoken
+            intent = classify_intent(user_request) if user_request else None
 
-            # Capture image
-            image, filepath = self.capture_image()
+            # Capture in the background while giving audio feedback
+            capture = self._executor.submit(self._capture_and_encode, intent)
+            self.speak("Taking picture")
+            image, filepath, encoded = capture.result()
 
-            # Analyze image with user's request
+            # Analyze image with user's request while announcing it
+            sentences = queue.Queue()
+            save_path = None if self.config.SAVE_FULL_RESOLUTION else filepath
+            analysis = self._executor.submit(
+                self._analyze_to_sentences, image, user_request, sentences, save_path, encoded, intent
+            )
             self.speak("Analyzing")
-            description = self.analyze_image(image, user_request)
 
-            # Speak result
-            self.speak(description)
+            # Speak each sentence of the result as soon as it arrives
+            for sentence in iter(sentences.get, None):
+                self.speak(sentence)
+            analysis.result()
 
         except Exception as e:
             error_msg = "Sorry, I encountered an error processing the image"
@@ -450,6 +922,9 @@ IMPORTANT: Be concise, clear, and prioritize safety-critical information first (
     def cleanup(self):
         """Clean up resources"""
         print("\nCleaning up...")
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.image_optimizer.shutdown()
         
         if self.camera:
             try:
@@ -468,11 +943,38 @@ IMPORTANT: Be concise, clear, and prioritize safety-critical information first (
         print("Cleanup complete")
 
 
+def probe(config: Config) -> int:
+    """
+    Check the configuration without touching any hardware
+
+    Returns:
+        Exit code (0 if the assistant is ready to start)
+    """
+    print(f"Gemini model: {config.GEMINI_MODEL}")
+    print(f"Keyword: '{config.KEYWORD}'")
+    print(f"Analysis resolution: {config.ANALYSIS_RESOLUTION}")
+
+    if not config.GEMINI_API_KEY:
+        print("GEMINI_API_KEY is not set - add it to your .env file")
+        return 1
+
+    print("Configuration OK")
+    return 0
+
+
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="AI Vision Assistant for Raspberry Pi Zero")
+    parser.add_argument('--probe', action='store_true',
+                        help="check the configuration and exit without starting the hardware")
+    args = parser.parse_args()
+
     try:
         # Create configuration
         config = Config()
+
+        if args.probe:
+            return probe(config)
         
         # Create and run assistant
         assistant = VisionAssistant(config)
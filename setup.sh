@@ -34,6 +34,7 @@ sudo apt-get install -y \
     flac \
     espeak \
     alsa-utils \
+    libjpeg62-turbo-dev \
     python3-dev \
     python3-setuptools
 
@@ -41,6 +42,9 @@ sudo apt-get install -y \
 echo "Step 3: Installing Python packages..."
 pip3 install --break-system-packages -r requirements.txt
 
+# Precompile Python files so the first start doesn't have to
+python3 -m compileall -q -l -j 0 .
+
 # Enable camera interface
 echo "Step 4: Enabling camera interface..."
 sudo raspi-config nonint do_camera 0
@@ -1,253 +1,399 @@
 #!/usr/bin/env python3
 """
-Simulation Test Script for AI Vision Assistant
+Simulation Tests for AI Vision Assistant
 This allows testing the application without Raspberry Pi hardware
 
+The hardware mocks live in conftest.py. Run with either:
+    python3 test_simulation.py
+    python3 -m pytest test_simulation.py -n auto   (parallel, needs pytest-xdist)
+
 Perfect for development and testing before deployment!
 """
 
 import io
 import sys
-from unittest.mock import MagicMock, patch
+import json
+import queue
+import subprocess
+import importlib.util
+import py_compile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
 from PIL import Image
-import os
-
-# Create mock .env file if it doesn't exist
-if not os.path.exists('.env'):
-    print("Creating temporary .env file for testing...")
-    with open('.env', 'w') as f:
-        f.write('GEMINI_API_KEY=test_api_key_for_simulation\n')
-    temp_env_created = True
-else:
-    temp_env_created = False
-
-print("="*60)
-print("AI Vision Assistant - Simulation Test Mode")
-print("="*60)
-print("\nThis simulates all hardware components for testing.")
-print("No Raspberry Pi, camera, or audio hardware needed!\n")
-
-# Mock the hardware-specific modules
-print("Step 1: Mocking hardware components...")
-
-# Mock Picamera2
-print("  - Mocking Picamera2 (camera)...")
-sys.modules['picamera2'] = MagicMock()
-sys.modules['picamera2'].Picamera2 = MagicMock
-
-# Mock PyAudio (for speech recognition)
-print("  - Mocking PyAudio (microphone)...")
-sys.modules['pyaudio'] = MagicMock()
-
-# Mock pyttsx3 (text-to-speech)
-print("  - Mocking pyttsx3 (speaker)...")
-mock_tts = MagicMock()
-mock_tts_instance = MagicMock()
-mock_tts.init.return_value = mock_tts_instance
-sys.modules['pyttsx3'] = mock_tts
-
-# Now import the actual main module
-print("\nStep 2: Importing main.py...")
-try:
-    import main
-    print("  ✓ main.py imported successfully!")
-except Exception as e:
-    print(f"  ✗ Error importing main.py: {e}")
-    sys.exit(1)
-
-# Test individual components
-print("\nStep 3: Testing individual components...")
-
-# Test Config class
-print("\n--- Testing Configuration ---")
-try:
-    config = main.Config()
-    print(f"  ✓ Config loaded")
-    print(f"    - Keyword: '{config.KEYWORD}'")
-    print(f"    - Exit keywords: {config.EXIT_KEYWORDS}")
-    print(f"    - Max image size: {config.MAX_IMAGE_SIZE}px")
-    print(f"    - JPEG quality: {config.JPEG_QUALITY}")
-    print(f"    - Camera resolution: {config.CAMERA_RESOLUTION}")
-    print(f"    - TTS rate: {config.TTS_RATE} WPM")
-    print(f"    - TTS volume: {config.TTS_VOLUME}")
-except Exception as e:
-    print(f"  ✗ Config error: {e}")
-    sys.exit(1)
-
-# Test ImageOptimizer
-print("\n--- Testing Image Optimizer ---")
-try:
-    # Create a test image
+
+
+def test_config(config):
+    """Configuration loads with sensible values"""
+    assert config.KEYWORD
+    assert config.EXIT_KEYWORDS
+    assert 1 <= config.JPEG_QUALITY <= 100
+    assert config.MAX_IMAGE_SIZE > 0
+    # The ISP downscales to the analysis size, so it must fit inside the sensor mode
+    assert config.ANALYSIS_RESOLUTION[0] <= config.CAMERA_RESOLUTION[0]
+    assert config.ANALYSIS_RESOLUTION[1] <= config.CAMERA_RESOLUTION[1]
+
+
+def test_image_optimizer(main_module):
+    """Images are resized with their aspect ratio kept, and encoded as JPEG"""
     test_image = Image.new('RGB', (2000, 1500), color='red')
-    print(f"  Created test image: {test_image.size}")
 
-    # Optimize it
-    optimized_bytes = main.ImageOptimizer.optimize_image(
+    optimized_bytes = main_module.ImageOptimizer.optimize_image(
         test_image,
         max_size=1024,
         quality=85
     )
 
-    # Load optimized image
     optimized_image = Image.open(io.BytesIO(optimized_bytes))
-    print(f"  ✓ Image optimization works!")
-    print(f"    - Original size: 2000x1500")
-    print(f"    - Optimized size: {optimized_image.size}")
-    print(f"    - File size: {len(optimized_bytes) / 1024:.1f} KB")
+    assert optimized_image.format == 'JPEG'
+    assert max(optimized_image.size) == 1024
 
     # Verify aspect ratio maintained
     original_aspect = 2000 / 1500
     optimized_aspect = optimized_image.size[0] / optimized_image.size[1]
-    aspect_diff = abs(original_aspect - optimized_aspect)
+    assert abs(original_aspect - optimized_aspect) < 0.01
+
+
+def test_image_optimizer_keeps_source(main_module):
+    """The caller's image isn't modified, even a not-yet-decoded JPEG"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (3072, 1728), color='blue').save(buffer, format='JPEG')
+    source = Image.open(io.BytesIO(buffer.getvalue()))
+
+    main_module.ImageOptimizer.optimize_image(source, max_size=768, quality=85)
+
+    assert source.size == (3072, 1728)
+
+
+def test_image_optimizer_jpeg_modes(main_module):
+    """Both JPEG streams decode completely: baseline for the fast upload path,
+    progressive for archival copies"""
+    test_image = Image.new('RGB', (2000, 1500), color='red')
+
+    fast_image = Image.open(io.BytesIO(
+        main_module.ImageOptimizer.optimize_image(test_image, max_size=1024, quality=85)
+    ))
+    fast_image.load()
+    assert not fast_image.info.get('progressive')
+
+    archival_image = Image.open(io.BytesIO(
+        main_module.ImageOptimizer.optimize_image(test_image, max_size=2000, quality=85,
+                                                  fast=False)
+    ))
+    archival_image.load()
+    assert archival_image.info.get('progressive')
+
+
+@pytest.mark.parametrize("user_request, intent", [
+    ("read the prescription", 'medication'),
+    ("what dose of this medicine", 'medication'),
+    ("what ingredients are in this", 'food'),
+    ("read this document", 'document'),
+    ("what is this", 'general'),
+    # "tell me" overlaps "medication" - the higher priority still wins
+    ("tell medication info", 'medication'),
+    ("hello there", None),
+])
+def test_classify_intent(main_module, user_request, intent):
+    """Requests map to the highest-priority intent whose keywords they contain"""
+    assert main_module.classify_intent(user_request) == intent
+
+
+def test_build_prompt(main_module, assistant):
+    """Each intent gets its own prompt; no request (or no match) gets the default"""
+    build_prompt = assistant._build_prompt
+
+    assert build_prompt() == main_module.DEFAULT_PROMPT
+    assert build_prompt("hello there", None) == main_module.DEFAULT_PROMPT
+    assert build_prompt("read the prescription", 'medication') == \
+        main_module.INTENT_PROMPTS['medication']
+    assert build_prompt("what is this", 'general') == \
+        main_module.GENERAL_PROMPT_TEMPLATE.format(user_request="what is this")
+
+
+def _checkerboard(size, squares=64):
+    """Grayscale checkerboard - maximal detail at choose_quality's 64x64 scale"""
+    board = Image.frombytes('L', (squares, squares), bytes(
+        255 if (x + y) % 2 else 0 for y in range(squares) for x in range(squares)
+    ))
+    return board.resize(size, Image.Resampling.NEAREST).convert('RGB')
+
+
+def test_choose_quality(main_module):
+    """Flat images get low quality, detailed ones high, small ones a fixed value"""
+    choose_quality = main_module.ImageOptimizer.choose_quality
+
+    flat = choose_quality(Image.new('RGB', (1024, 1024), color='gray'))
+    detailed = choose_quality(_checkerboard((1024, 1024)))
+
+    assert flat == 60
+    assert detailed == 90
+    # Under 512x512 the image isn't analyzed at all
+    assert choose_quality(_checkerboard((400, 400))) == 75
+
+
+@pytest.mark.parametrize("intent, setting", [
+    ('medication', 'TEXT_JPEG_QUALITY'),
+    ('food', 'TEXT_JPEG_QUALITY'),
+    ('document', 'TEXT_JPEG_QUALITY'),
+    # The default prompt reads labels, so it never gets the adaptive quality
+    (None, 'JPEG_QUALITY'),
+])
+def test_upload_quality(assistant, intent, setting):
+    """Text-reading requests keep a fixed quality, whatever the image looks like"""
+    image = Image.new('RGB', (768, 432), color='gray')
+    assert assistant._upload_quality(image, intent) == getattr(assistant.config, setting)
+
+
+def test_upload_quality_general(main_module, assistant, monkeypatch):
+    """General requests use the adaptive quality, or SCENE_JPEG_QUALITY when it's off"""
+    image = _checkerboard((768, 432))
+    expected = main_module.ImageOptimizer.choose_quality(image)
+    assert assistant._upload_quality(image, 'general') == expected
+
+    monkeypatch.setattr(assistant.config, 'ADAPTIVE_JPEG_QUALITY', False)
+    assert assistant._upload_quality(image, 'general') == assistant.config.SCENE_JPEG_QUALITY
+
+
+def test_vision_assistant_init(assistant):
+    """VisionAssistant initializes on mocked hardware"""
+    assert assistant.camera is not None
+    assert assistant.microphone is not None
+    assert assistant.tts_engine is not None
+    assert assistant.gemini_model is not None
+
+
+def test_gemini_warmup_is_bounded(assistant):
+    """The startup warmup request can't hang on SDK default timeouts/retries"""
+    _, kwargs = assistant.gemini_model.count_tokens.call_args
+    assert kwargs['request_options'] == {"timeout": 5, "retry": None}
+
+
+@pytest.mark.parametrize("msg", [
+    "AI Vision Assistant ready",
+    "Taking picture",
+    "Analyzing",
+    "This is a test description of an image",
+])
+def test_tts(assistant, msg):
+    """Messages are handed to the TTS engine"""
+    assistant.speak(msg)
+    if msg not in assistant.canned_audio:
+        assistant.tts_engine.say.assert_called_with(msg)
+
+
+def _fake_gemini(*chunks):
+    """Gemini model whose generate_content streams the given text chunks"""
+    model = MagicMock()
+    model.generate_content.side_effect = lambda *args, **kwargs: iter(
+        SimpleNamespace(text=chunk) for chunk in chunks
+    )
+    return model
+
+
+def _stream_sentences(assistant):
+    """Run _analyze_to_sentences on a small image and collect the queued sentences"""
+    sentences = queue.Queue()
+    assistant._analyze_to_sentences(Image.new('RGB', (200, 200)), None, sentences)
+    return list(iter(sentences.get, None))
+
+
+def test_analyze_to_sentences(assistant, monkeypatch):
+    """Streamed text is split into sentences as they complete, and the tail is kept"""
+    monkeypatch.setattr(assistant, 'gemini_model',
+                        _fake_gemini("Hello there. How", " are you? Fine"))
+
+    assert _stream_sentences(assistant) == ["Hello there.", "How are you?", "Fine"]
+
+
+def test_analyze_to_sentences_bullets(assistant, monkeypatch):
+    """Bullet lines without closing punctuation are spoken as soon as they end"""
+    sentences = queue.Queue()
+
+    def bullet_stream(*args, **kwargs):
+        yield SimpleNamespace(text="\n- Aspirin 100")
+        yield SimpleNamespace(text="mg\n- Take one daily\n")
+        # Both finished lines are queued before the stream ends
+        assert sentences.qsize() == 2
+        yield SimpleNamespace(text="- Expires 03/2027")
+
+    model = MagicMock()
+    model.generate_content.side_effect = bullet_stream
+    monkeypatch.setattr(assistant, 'gemini_model', model)
+
+    assistant._analyze_to_sentences(Image.new('RGB', (200, 200)), None, sentences)
+
+    assert list(iter(sentences.get, None)) == \
+        ["- Aspirin 100mg", "- Take one daily", "- Expires 03/2027"]
+
+
+def test_analyze_to_sentences_error(assistant, monkeypatch):
+    """A failed request is spoken as an error message"""
+    model = MagicMock()
+    model.generate_content.side_effect = RuntimeError("quota exceeded")
+    monkeypatch.setattr(assistant, 'gemini_model', model)
+
+    sentences = _stream_sentences(assistant)
+
+    assert len(sentences) == 1
+    assert sentences[0].startswith("Sorry") and "quota exceeded" in sentences[0]
+
+
+def test_analyze_to_sentences_error_mid_stream(assistant, monkeypatch):
+    """Text streamed before an error is still spoken, followed by the error message"""
+    def broken_stream(*args, **kwargs):
+        yield SimpleNamespace(text="First part. Sec")
+        raise RuntimeError("connection reset")
 
-    if aspect_diff < 0.01:
-        print(f"    - Aspect ratio: Maintained ✓")
+    model = MagicMock()
+    model.generate_content.side_effect = broken_stream
+    monkeypatch.setattr(assistant, 'gemini_model', model)
+
+    sentences = _stream_sentences(assistant)
+
+    assert sentences[:2] == ["First part.", "Sec"]
+    assert len(sentences) == 3 and "connection reset" in sentences[2]
+
+
+def test_process_capture_command(main_module, assistant, monkeypatch, tmp_path):
+    """Capture, encode, analyze and speak the result; the upload JPEG is saved"""
+    monkeypatch.setattr(assistant.camera.capture_image, 'return_value',
+                        Image.new('RGB', (768, 432), color='green'))
+    monkeypatch.setattr(assistant, '_img_dir', tmp_path)
+    monkeypatch.setattr(assistant, 'image_optimizer', main_module.AsyncImageOptimizer())
+    monkeypatch.setattr(assistant, 'tts_engine', MagicMock())
+    monkeypatch.setattr(assistant, 'gemini_model', _fake_gemini("A green wall. ", "Nothing else."))
+
+    classify = MagicMock(wraps=main_module.classify_intent)
+    monkeypatch.setattr(main_module, 'classify_intent', classify)
+
+    assistant.process_capture_command("read the prescription")
+    # Waits for the background file write
+    assistant.image_optimizer.shutdown()
+
+    # The request is classified once, before capture
+    classify.assert_called_once_with("read the prescription")
+
+    spoken = [call.args[0] for call in assistant.tts_engine.say.call_args_list]
+    assert spoken[-2:] == ["A green wall.", "Nothing else."]
+
+    saved = list(tmp_path.glob('capture_*.jpg'))
+    assert len(saved) == 1
+    assert Image.open(saved[0]).size == (768, 432)
+
+
+def test_tts_canned_fallback(assistant, monkeypatch, tmp_path):
+    """Canned phrases are still spoken by the TTS engine if aplay fails"""
+    wav = tmp_path / 'phrase.wav'
+    wav.write_bytes(b'')
+    monkeypatch.setattr(assistant, 'canned_audio', {"Taking picture": wav})
+    monkeypatch.setattr(assistant, 'tts_engine', MagicMock())
+
+    def failing_aplay(cmd, **kwargs):
+        raise subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(subprocess, 'run', failing_aplay)
+    assistant.speak("Taking picture")
+
+    assistant.tts_engine.say.assert_called_once_with("Taking picture")
+
+
+def test_upload_encode_before_archival(assistant, monkeypatch):
+    """The upload encode is queued ahead of the full-resolution archival encode"""
+    monkeypatch.setattr(assistant.camera.capture_image, 'return_value',
+                        Image.new('RGB', (1920, 1080)))
+    monkeypatch.setattr(assistant.config, 'SAVE_FULL_RESOLUTION', True)
+    monkeypatch.setattr(assistant, 'image_optimizer', MagicMock())
+
+    assistant._capture_and_encode()
+
+    submitted = assistant.image_optimizer.submit_optimize.call_args_list
+    assert [call.kwargs['fast'] for call in submitted] == [True, False]
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("{keyword}", "capture"),
+    ("{keyword} read this document", "capture"),
+    ("exit", "exit"),
+    ("random words", "ignore"),
+])
+def test_voice_logic(config, command, expected):
+    """Voice commands trigger the right action (same checks as VisionAssistant.run)"""
+    text = command.format(keyword=config.KEYWORD).lower()
+
+    if any(exit_word in text for exit_word in config.EXIT_KEYWORDS):
+        action = "exit"
+    elif config.KEYWORD in text:
+        action = "capture"
     else:
-        print(f"    - Aspect ratio: Warning - changed by {aspect_diff:.3f}")
-
-except Exception as e:
-    print(f"  ✗ Image optimizer error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test VisionAssistant initialization (with mocks)
-print("\n--- Testing Vision Assistant Initialization ---")
-try:
-    with patch('speech_recognition.Recognizer'), \
-         patch('speech_recognition.Microphone'):
-
-        # Mock the camera
-        mock_camera = MagicMock()
-        mock_camera.create_still_configuration.return_value = {}
-        sys.modules['picamera2'].Picamera2.return_value = mock_camera
-
-        # Mock the Gemini API
-        with patch('google.generativeai.configure'), \
-             patch('google.generativeai.GenerativeModel'):
-
-            assistant = main.VisionAssistant(config)
-            print("  ✓ VisionAssistant initialized successfully!")
-            print("    - Camera: Mocked ✓")
-            print("    - Speech recognizer: Mocked ✓")
-            print("    - TTS engine: Mocked ✓")
-            print("    - Gemini API: Mocked ✓")
-
-except Exception as e:
-    print(f"  ✗ VisionAssistant initialization error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test speak function
-print("\n--- Testing Text-to-Speech ---")
-try:
-    test_messages = [
-        "AI Vision Assistant ready",
-        "Taking picture",
-        "Analyzing",
-        "This is a test description of an image"
-    ]
-
-    for msg in test_messages:
-        assistant.speak(msg)
-        print(f"  ✓ TTS called with: '{msg[:30]}...'")
-
-    print("  ✓ Text-to-speech working!")
-
-except Exception as e:
-    print(f"  ✗ TTS error: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Test voice recognition simulation
-print("\n--- Testing Voice Recognition (Simulated) ---")
-try:
-    # Simulate different voice commands
-    test_commands = [
-        (config.KEYWORD, "Should trigger capture"),
-        ("exit", "Should exit program"),
-        ("random words", "Should be ignored"),
-    ]
-
-    for command, description in test_commands:
-        # Simulate hearing the command
-        if config.KEYWORD in command.lower():
-            print(f"  ✓ '{command}' detected - {description}")
-        elif any(exit_word in command.lower() for exit_word in config.EXIT_KEYWORDS):
-            print(f"  ✓ '{command}' detected - {description}")
-        else:
-            print(f"  ✓ '{command}' ignored - {description}")
-
-    print("  ✓ Voice command logic working!")
-
-except Exception as e:
-    print(f"  ✗ Voice recognition error: {e}")
-
-# Syntax validation
-print("\n--- Syntax Validation ---")
-try:
-    import py_compile
-    py_compile.compile('main.py', doraise=True)
-    print("  ✓ main.py syntax is valid!")
-except py_compile.PyCompileError as e:
-    print(f"  ✗ Syntax error in main.py: {e}")
-    sys.exit(1)
-
-# Check all imports
-print("\n--- Checking Required Packages ---")
-required_packages = [
+        action = "ignore"
+
+    assert action == expected
+
+
+@pytest.mark.parametrize("keyword, heard, expected", [
+    ('click', 'click', True),
+    ('what is this', 'what is this', True),
+    ('what is this', '[unk] what is this', True),
+    ('click', 'stop', True),
+    ('what is this', 'what', False),
+    ('click', '', False),
+])
+def test_spot_keyword(assistant, monkeypatch, keyword, heard, expected):
+    """Offline keyword spotting matches single and multi-word keywords"""
+    spotter = MagicMock()
+    spotter.FinalResult.return_value = json.dumps({'text': heard})
+    monkeypatch.setattr(assistant, 'keyword_spotter', spotter)
+    monkeypatch.setattr(assistant.config, 'KEYWORD', keyword)
+
+    assert assistant._spot_keyword(MagicMock()) is expected
+
+
+def test_syntax():
+    """main.py compiles"""
+    py_compile.compile(str(Path(__file__).parent / 'main.py'), doraise=True)
+
+
+@pytest.mark.parametrize("module_name, package_name", [
     ('PIL', 'Pillow'),
     ('google.generativeai', 'google-generativeai'),
     ('dotenv', 'python-dotenv'),
-]
-
-all_packages_ok = True
-for module_name, package_name in required_packages:
+])
+def test_required_package(module_name, package_name):
+    """Required packages are installed (find_spec checks without importing)"""
     try:
-        __import__(module_name)
-        print(f"  ✓ {package_name}")
-    except ImportError:
-        print(f"  ✗ {package_name} - NOT INSTALLED")
-        all_packages_ok = False
-
-if not all_packages_ok:
-    print("\n  Install missing packages with:")
-    print("  pip3 install -r requirements.txt")
-
-# Final summary
-print("\n" + "="*60)
-print("SIMULATION TEST SUMMARY")
-print("="*60)
-
-test_results = [
-    ("Configuration loading", "✓ PASS"),
-    ("Image optimization", "✓ PASS"),
-    ("Vision Assistant init", "✓ PASS"),
-    ("Text-to-speech", "✓ PASS"),
-    ("Voice command logic", "✓ PASS"),
-    ("Syntax validation", "✓ PASS"),
-]
-
-for test_name, result in test_results:
-    print(f"{test_name:.<40} {result}")
-
-print("\n" + "="*60)
-print("✓ All simulation tests passed!")
-print("="*60)
-print("\nYour code is ready for deployment to Raspberry Pi!")
-print("\nNext steps:")
-print("1. Copy all files to your Raspberry Pi")
-print("2. Run setup.sh on the Pi")
-print("3. Add your real Gemini API key to .env")
-print("4. Run: python3 main.py")
-print("\nFor high school project demo:")
-print("- This simulation can run on any computer")
-print("- Great for showing the code logic without hardware")
-print("- Safe to test modifications before deploying")
-print("="*60)
-
-# Cleanup
-if temp_env_created:
-    os.remove('.env')
-    print("\n(Temporary .env file removed)")
+        installed = importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        installed = False
+
+    assert installed, f"{package_name} not installed - run: pip3 install -r requirements.txt"
+
+
+if __name__ == '__main__':
+    print("="*60)
+    print("AI Vision Assistant - Simulation Test Mode")
+    print("="*60)
+    print("\nThis simulates all hardware components for testing.")
+    print("No Raspberry Pi, camera, or audio hardware needed!\n")
+
+    exit_code = pytest.main([__file__, '-v'])
+
+    if exit_code == 0:
+        print("\n" + "="*60)
+        print("✓ All simulation tests passed!")
+        print("="*60)
+        print("\nYour code is ready for deployment to Raspberry Pi!")
+        print("\nNext steps:")
+        print("1. Copy all files to your Raspberry Pi")
+        print("2. Run setup.sh on the Pi")
+        print("3. Add your real Gemini API key to .env")
+        print("4. Run: python3 main.py")
+        print("\nFor high school project demo:")
+        print("- This simulation can run on any computer")
+        print("- Great for showing the code logic without hardware")
+        print("- Safe to test modifications before deploying")
+        print("="*60)
+
+    sys.exit(exit_code)